@@ -1,4 +1,5 @@
 from dotenv import load_dotenv
+import functools
 import os
 
 try:
@@ -15,8 +16,14 @@ except OSError:
 finally:
     print('.env file checked for existence!')
 
+@functools.lru_cache(maxsize=1)
+def _bootstrap_env() -> bool:
+    """Load the .env file into the environment once per interpreter."""
+    load_dotenv()
+    return True
+
 # Load environment variables
-load_dotenv()
+_bootstrap_env()
 
 # ETFs (Index Funds)
 etf_list = ['SPY', 'QQQ', 'AGG']
@@ -32,5 +39,5 @@ db_credentials = {
     "host": os.getenv(key="PSQL_HOST_ADDR", default="No Key Found"),
     "port": os.getenv(key="PSQL_PORT", default="No Key Found"),
     "database": os.getenv(key="DB_NAME", default="No Key Found"),
-    "timeout": os.getenv(key="CONNECTION_TIMEOUT", default="No Key Found"),
+    "timeout": int(os.getenv(key="CONNECTION_TIMEOUT", default="10")),
 }
\ No newline at end of file
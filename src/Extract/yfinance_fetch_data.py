@@ -1,14 +1,29 @@
 import yfinance as yf
+import pandas as pd
 
+# Yahoo rejects overly long multi-symbol URLs, so requests are capped at this many tickers
+MAX_TICKERS_PER_REQUEST = 20
 
-def fetch_yfinance_data(tickers_list: list[str], time_period: str) -> dict:
+
+def fetch_yfinance_data(tickers_list: list[str], time_period: str) -> pd.DataFrame:
     """
     Fetch historical stock data from Yahoo Finance for the given tickers.
-    
+
+    Tickers are downloaded in batches of up to MAX_TICKERS_PER_REQUEST symbols
+    (threaded within each batch) and the batches are joined column-wise.
+
     Args:
         tickers: List of stock ticker symbols.
         time_period: Time period for which to fetch data (e.g., '5d', '1mo', 'ytd') default is 'ytd'.
     """
-    data = yf.download(tickers_list, period=time_period, auto_adjust=False)
+    batches = [tickers_list[i:i + MAX_TICKERS_PER_REQUEST] for i in range(0, len(tickers_list), MAX_TICKERS_PER_REQUEST)]
+    frames = [
+        yf.download(batch, period=time_period, auto_adjust=False, threads=True, group_by='ticker')
+        for batch in batches
+    ]
+    if not frames:
+        return pd.DataFrame()
+
+    data = frames[0] if len(frames) == 1 else pd.concat(frames, axis=1)
 
-    return data
\ No newline at end of file
+    return data
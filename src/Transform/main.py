@@ -11,17 +11,29 @@ This module handles:
 
 import pandas as pd
 import numpy as np
+from numba import njit
 from typing import Dict, List, Optional, Union
 
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow is optional, without it dates stay datetime64
+    pa = None
+
+# Column layout of every transformed frame (matches the stock data table)
+_SCHEMA = ['ticker', 'date', 'open', 'high', 'low', 'close', 'adj_close', 'volume']
+# Built once at import; transforms hand out copies of it for empty input.
+# Ticker is categorical like the output of clean_stock_data, so empty and non-empty results share a dtype
+_EMPTY = pd.DataFrame(columns=_SCHEMA).astype({'ticker': 'category'})
+
 
 def transform_yfinance_data(data: pd.DataFrame) -> pd.DataFrame:
     """
     Transform Yahoo Finance data to match our data model.
     
     Yahoo Finance returns MultiIndex DataFrame with columns:
-    - Open, High, Low, Close, Volume, Adj Close (when auto_adjust=True)
+    - Open, High, Low, Close, Volume, Adj Close (when auto_adjust=False)
     - Index: Date (DatetimeIndex)
-    - Columns: MultiIndex with tickers as level 0
+    - Columns: MultiIndex with tickers as level 0 (group_by='ticker') or level 1
     
     Args:
         data: MultiIndex DataFrame from yfinance.download()
@@ -30,148 +42,41 @@ def transform_yfinance_data(data: pd.DataFrame) -> pd.DataFrame:
         DataFrame with columns: ticker, date, open, high, low, close, adj_close, volume
     """
     if data.empty:
-        return pd.DataFrame(columns=['ticker', 'date', 'open', 'high', 'low', 'close', 'adj_close', 'volume'])
-    
-    transformed_rows = []
+        return _EMPTY.copy()
     
     # Handle MultiIndex columns (multiple tickers or single ticker with MultiIndex)
     if isinstance(data.columns, pd.MultiIndex):
-        # Get all values from both levels
-        level0_values = data.columns.get_level_values(0).unique()
-        level1_values = data.columns.get_level_values(1).unique()
-        
         # Price column names that should NOT be treated as tickers
         price_keywords = ['Open', 'High', 'Low', 'Close', 'Volume', 'Adj Close', 'AdjClose', 'Adj']
         
-        # Determine which level contains tickers and which contains price types
-        # Typically: level 0 = tickers, level 1 = price types
-        # But sometimes it can be reversed or inconsistent
+        # Determine which level contains tickers: yfinance puts them in level 0 with group_by='ticker'
+        # and in level 1 otherwise, so if level 0 is made up only of price types the tickers are in level 1
+        level0_values = data.columns.get_level_values(0).unique()
+        ticker_level = 1 if all(str(v) in price_keywords for v in level0_values) else 0
         
-        # Check if level 0 looks like tickers (not all are price keywords)
-        level0_is_tickers = not all(str(v) in price_keywords for v in level0_values)
-        level1_is_tickers = not all(str(v) in price_keywords for v in level1_values)
+        # Reshape wide -> long in one go: one row per (date, ticker) with the price types as columns
+        result_df = data.stack(level=ticker_level, future_stack=True).reset_index(names=['date', 'ticker'])
         
-        if level0_is_tickers and not level1_is_tickers:
-            # Standard case: level 0 = tickers, level 1 = price types
-            tickers = [t for t in level0_values if str(t) not in price_keywords]
-        elif level1_is_tickers and not level0_is_tickers:
-            # Reversed case: level 1 = tickers, level 0 = price types
-            tickers = [t for t in level1_values if str(t) not in price_keywords]
-        else:
-            # Ambiguous - try to infer
-            # Usually tickers are shorter strings and price types are longer
-            potential_tickers = []
-            for val in level0_values:
-                val_str = str(val)
-                if val_str not in price_keywords and len(val_str) <= 10:  # Tickers are usually short
-                    potential_tickers.append(val)
-            tickers = potential_tickers if potential_tickers else level0_values.tolist()
+        # Standardize column names to lowercase in one pass ('Adj Close' / 'AdjClose' -> 'adj_close')
+        result_df.columns = [
+            'adj_close' if col == 'adjclose' else col
+            for col in (str(c).lower().replace(' ', '_') for c in result_df.columns)
+        ]
         
-        # If still no valid tickers, extract from first column tuple
-        if len(tickers) == 0 or all(str(t) in price_keywords for t in tickers):
-            first_col = data.columns[0]
-            if isinstance(first_col, tuple) and len(first_col) == 2:
-                # Try both positions
-                if str(first_col[0]) not in price_keywords:
-                    tickers = [first_col[0]]
-                elif str(first_col[1]) not in price_keywords:
-                    tickers = [first_col[1]]
-                else:
-                    tickers = [first_col[0]]  # Fallback to first element
-            else:
-                tickers = ['UNKNOWN']
+        # Ensure we have all required columns
+        required_cols = ['open', 'high', 'low', 'close', 'volume']
+        missing_cols = [col for col in required_cols if col not in result_df.columns]
+        if missing_cols:
+            raise ValueError(f"No valid data could be transformed. Missing required columns {missing_cols}. Available columns: {list(result_df.columns)}")
         
-        # Check if Adj Close exists
-        all_level1 = data.columns.get_level_values(1).unique()
-        has_adj_close = any('Adj' in str(val) or 'adj' in str(val).lower() for val in all_level1)
+        # Handle adj_close, using close as fallback (common when auto_adjust=True)
+        if 'adj_close' not in result_df.columns:
+            result_df['adj_close'] = result_df['close']
+        else:
+            result_df['adj_close'] = result_df['adj_close'].fillna(result_df['close'])
         
-        for ticker in tickers:
-            try:
-                # Access ticker data - try both level 0 and level 1
-                ticker_data = None
-                if ticker in data.columns.get_level_values(0):
-                    ticker_data = data[ticker].copy()
-                elif ticker in data.columns.get_level_values(1):
-                    # Ticker might be in level 1, need to transpose or filter differently
-                    # Filter columns where level 1 matches ticker
-                    mask = data.columns.get_level_values(1) == ticker
-                    ticker_data = data.loc[:, mask].copy()
-                    # The columns will still have MultiIndex, need to flatten
-                    if isinstance(ticker_data.columns, pd.MultiIndex):
-                        # Flatten by taking level 0 (price types)
-                        ticker_data.columns = ticker_data.columns.get_level_values(0)
-                else:
-                    # Ticker not found in either level - might be single ticker case
-                    # Use all columns and extract ticker from structure
-                    ticker_data = data.copy()
-                    if isinstance(data.columns[0], tuple):
-                        # Extract ticker from first column tuple
-                        first_col = data.columns[0]
-                        if len(first_col) >= 1:
-                            # Try to find which element is the ticker
-                            for elem in first_col:
-                                if str(elem) not in price_keywords:
-                                    ticker = elem
-                                    break
-                
-                if ticker_data is None:
-                    raise ValueError(f"Could not extract data for ticker {ticker}")
-                
-                # Reset index to get date as a column
-                ticker_data = ticker_data.reset_index()
-                
-                # Standardize column names to lowercase
-                ticker_data.columns = ticker_data.columns.str.lower()
-                
-                # Handle date column - yfinance uses 'Date' as index name
-                if 'date' not in ticker_data.columns:
-                    # Check if index was reset and first column is date
-                    if len(ticker_data.columns) > 0:
-                        first_col = ticker_data.columns[0]
-                        if pd.api.types.is_datetime64_any_dtype(ticker_data[first_col]):
-                            ticker_data.rename(columns={first_col: 'date'}, inplace=True)
-                        else:
-                            # Date might be in index name
-                            ticker_data.insert(0, 'date', ticker_data.index if hasattr(ticker_data, 'index') else pd.date_range('2024-01-01', periods=len(ticker_data)))
-                
-                # Ensure date column exists
-                if 'date' not in ticker_data.columns:
-                    ticker_data.insert(0, 'date', ticker_data.index)
-                
-                # Map common column name variations
-                column_mapping = {
-                    'adj close': 'adj_close',
-                    'adjclose': 'adj_close',
-                }
-                for old_name, new_name in column_mapping.items():
-                    if old_name in ticker_data.columns and new_name not in ticker_data.columns:
-                        ticker_data[new_name] = ticker_data[old_name]
-                
-                # Ensure we have all required columns
-                required_cols = ['open', 'high', 'low', 'close', 'volume']
-                missing_cols = [col for col in required_cols if col not in ticker_data.columns]
-                if missing_cols:
-                    raise ValueError(f"Missing required columns {missing_cols} for ticker {ticker}. Available columns: {list(ticker_data.columns)}")
-                
-                # Handle adj_close
-                if 'adj_close' not in ticker_data.columns:
-                    if 'adj close' in ticker_data.columns:
-                        ticker_data['adj_close'] = ticker_data['adj close']
-                    else:
-                        # Use close as fallback (common when auto_adjust=True)
-                        ticker_data['adj_close'] = ticker_data['close']
-                
-                # Add ticker column
-                ticker_data['ticker'] = ticker
-                
-                # Select and reorder columns to match data model
-                ticker_data = ticker_data[['ticker', 'date', 'open', 'high', 'low', 'close', 'adj_close', 'volume']]
-                
-                transformed_rows.append(ticker_data)
-            except Exception as e:
-                # Skip this ticker if there's an error, but log it
-                print(f"Warning: Error processing ticker {ticker}: {e}")
-                continue
+        # Select and reorder columns to match data model
+        result_df = result_df[_SCHEMA]
     else:
         # Flat columns case - single ticker with non-MultiIndex columns
         data_reset = data.reset_index()
@@ -197,13 +102,7 @@ def transform_yfinance_data(data: pd.DataFrame) -> pd.DataFrame:
             # Try to infer from column names or use 'UNKNOWN'
             data_reset['ticker'] = 'UNKNOWN'  # Will need to be set by caller
         
-        transformed_rows.append(data_reset[['ticker', 'date', 'open', 'high', 'low', 'close', 'adj_close', 'volume']])
-    
-    if not transformed_rows:
-        raise ValueError("No valid data could be transformed. Check input DataFrame structure.")
-    
-    # Combine all tickers
-    result_df = pd.concat(transformed_rows, ignore_index=True)
+        result_df = data_reset[_SCHEMA]
     
     # Clean and validate data
     result_df = clean_stock_data(result_df)
@@ -225,37 +124,29 @@ def transform_finnhub_data(data: pd.DataFrame) -> pd.DataFrame:
         DataFrame with columns: ticker, date, open, high, low, close, adj_close, volume
     """
     if data.empty:
-        return pd.DataFrame(columns=['ticker', 'date', 'open', 'high', 'low', 'close', 'adj_close', 'volume'])
-    
-    df = data.copy()
+        return _EMPTY.copy()
     
-    # Rename columns to match our standard
-    column_mapping = {
-        'symbol': 'ticker',
-        'datetime': 'date'
-    }
-    df.rename(columns=column_mapping, inplace=True)
+    # Map Finnhub column names onto ours (rename is lazy under copy-on-write, no data is copied)
+    df = data.rename(columns={'symbol': 'ticker', 'datetime': 'date'})
     
-    # Ensure date is datetime type
-    if 'date' in df.columns:
-        df['date'] = pd.to_datetime(df['date'])
-    elif 'datetime' in df.columns:
-        df['date'] = pd.to_datetime(df['datetime'])
-        df.drop(columns=['datetime'], inplace=True)
-    
-    # Finnhub doesn't provide adj_close, so we'll use close as fallback
-    # In production, you might want to calculate it based on splits/dividends
-    if 'adj_close' not in df.columns:
-        df['adj_close'] = df['close']
-    
-    # Ensure all required columns exist
-    required_cols = ['ticker', 'date', 'open', 'high', 'low', 'close', 'adj_close', 'volume']
-    missing_cols = [col for col in required_cols if col not in df.columns]
+    # Ensure all required columns exist (adj_close is optional, see below)
+    missing_cols = [col for col in _SCHEMA if col != 'adj_close' and col not in df.columns]
     if missing_cols:
         raise ValueError(f"Missing required columns: {missing_cols}")
     
-    # Select and reorder columns
-    df = df[required_cols]
+    # Build the output columns in one constructor call, parsing the whole date column at once.
+    # Finnhub doesn't provide adj_close, so we'll use close as fallback
+    # In production, you might want to calculate it based on splits/dividends
+    df = pd.DataFrame({
+        'ticker': df['ticker'],
+        'date': pd.to_datetime(df['date']),
+        'open': df['open'],
+        'high': df['high'],
+        'low': df['low'],
+        'close': df['close'],
+        'adj_close': df['adj_close'] if 'adj_close' in df.columns else df['close'],
+        'volume': df['volume']
+    })
     
     # Clean and validate data
     df = clean_stock_data(df)
@@ -263,6 +154,35 @@ def transform_finnhub_data(data: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+@njit(cache=True)
+def _valid_mask(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    adj_close: np.ndarray,
+    volume: np.ndarray
+) -> np.ndarray:
+    """
+    Row-wise price and volume checks for clean_stock_data.
+    
+    A row is valid when every price is present and positive, high/low bound
+    open and close, and volume is non-negative (missing volume counts as 0).
+    Comparisons against NaN are False, so missing prices fail the checks.
+    """
+    n = open_.shape[0]
+    valid = np.empty(n, dtype=np.bool_)
+    for i in range(n):
+        valid[i] = (
+            open_[i] > 0 and high[i] > 0 and low[i] > 0 and close[i] > 0 and adj_close[i] > 0
+            and high[i] >= low[i]
+            and high[i] >= open_[i] and high[i] >= close[i]
+            and low[i] <= open_[i] and low[i] <= close[i]
+            and not volume[i] < 0
+        )
+    return valid
+
+
 def clean_stock_data(df: pd.DataFrame) -> pd.DataFrame:
     """
     Clean and validate stock data.
@@ -283,50 +203,63 @@ def clean_stock_data(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df
     
-    df = df.copy()
+    # Columns are only ever replaced, never written in place, so a shallow copy keeps the caller's frame intact
+    df = df.copy(deep=False)
     
     # Convert date to datetime if it's not already
     if 'date' in df.columns:
-        df['date'] = pd.to_datetime(df['date'])
-        # Extract just the date part (remove time if present)
-        df['date'] = df['date'].dt.date
+        # Remove time if present but stay datetime64 (not python date objects) so dedup/sort stay vectorized
+        df['date'] = pd.to_datetime(df['date'], format='ISO8601', cache=True).dt.normalize()
     
-    # Ensure ticker is string
+    # Ensure ticker is an upper-case categorical (a handful of symbols repeated over every row).
+    # Only the distinct symbols are upper-cased, then the row codes are remapped onto the sorted categories
     if 'ticker' in df.columns:
-        df['ticker'] = df['ticker'].astype(str).str.upper()
-    
-    # Remove rows where critical price data is missing
+        codes, symbols = pd.factorize(df['ticker'])  # missing tickers get code -1 and are left out of symbols
+        symbols = np.char.upper(np.asarray(symbols, dtype=str))
+        categories, symbol_codes = np.unique(symbols, return_inverse=True)
+        # Appending -1 makes code -1 look up -1 again, so missing tickers stay missing
+        df['ticker'] = pd.Categorical.from_codes(np.append(symbol_codes, -1)[codes], categories=categories)
+    
+    # Build a single validity mask and filter once instead of once per rule.
+    # The price and volume rules run in one compiled pass over plain float64 arrays
     price_cols = ['open', 'high', 'low', 'close', 'adj_close']
-    df = df.dropna(subset=price_cols)
+    open_, high, low, close, adj_close = (df[col].to_numpy(dtype=np.float64, na_value=np.nan) for col in price_cols)
+    if 'volume' in df.columns:
+        volume = df['volume'].to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        volume = np.zeros(len(df))
+    valid = _valid_mask(open_, high, low, close, adj_close, volume)
     
-    # Validate prices are positive
-    for col in price_cols:
-        df = df[df[col] > 0]
+    # Remove rows where the ticker or date is missing
+    key_cols = [col for col in ['ticker', 'date'] if col in df.columns]
+    valid &= df[key_cols].notna().all(axis=1).to_numpy()
     
-    # Validate high >= low, high >= open, high >= close, low <= open, low <= close
-    df = df[
-        (df['high'] >= df['low']) &
-        (df['high'] >= df['open']) &
-        (df['high'] >= df['close']) &
-        (df['low'] <= df['open']) &
-        (df['low'] <= df['close'])
-    ]
+    df = df.loc[valid]
     
-    # Ensure volume is non-negative integer
+    # Ensure volume is an integer
     if 'volume' in df.columns:
-        df['volume'] = df['volume'].fillna(0)
-        df['volume'] = df['volume'].astype(int)
-        df = df[df['volume'] >= 0]
+        df['volume'] = df['volume'].fillna(0).astype(int)
     
     # Remove duplicates (same ticker and date)
     df = df.drop_duplicates(subset=['ticker', 'date'], keep='first')
     
     # Sort by ticker and date
-    df = df.sort_values(['ticker', 'date']).reset_index(drop=True)
+    df = df.sort_values(['ticker', 'date'], ignore_index=True)
+    
+    # Store dates as Arrow date32 when pyarrow is available (4 bytes per day, values come back as datetime.date)
+    if pa is not None and 'date' in df.columns:
+        df['date'] = df['date'].astype(pd.ArrowDtype(pa.date32()))
     
     return df
 
 
+# Transformer for each supported data source, keyed by lower-case source name
+_DISPATCH = {
+    'yfinance': transform_yfinance_data,
+    'finnhub': transform_finnhub_data
+}
+
+
 def transform_extracted_data(extracted_data: Union[Dict, pd.DataFrame], source: str = 'yfinance') -> pd.DataFrame:
     """
     Main transformation function that routes to appropriate transformer based on source.
@@ -343,7 +276,7 @@ def transform_extracted_data(extracted_data: Union[Dict, pd.DataFrame], source:
         # This handles the current placeholder structure
         if 'api_1_data' in extracted_data or 'api_2_data' in extracted_data:
             # Placeholder data - return empty DataFrame with correct structure
-            return pd.DataFrame(columns=['ticker', 'date', 'open', 'high', 'low', 'close', 'adj_close', 'volume'])
+            return _EMPTY.copy()
         else:
             # Try to find DataFrame in dict
             for key, value in extracted_data.items():
@@ -357,12 +290,11 @@ def transform_extracted_data(extracted_data: Union[Dict, pd.DataFrame], source:
         raise TypeError(f"extracted_data must be DataFrame or dict containing DataFrame, got {type(extracted_data)}")
     
     # Route to appropriate transformer
-    if source.lower() == 'yfinance':
-        return transform_yfinance_data(extracted_data)
-    elif source.lower() == 'finnhub':
-        return transform_finnhub_data(extracted_data)
-    else:
-        raise ValueError(f"Unknown data source: {source}. Supported sources: 'yfinance', 'finnhub'")
+    try:
+        transform = _DISPATCH[source.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown data source: {source}. Supported sources: 'yfinance', 'finnhub'") from None
+    return transform(extracted_data)
 
 
 if __name__ == "__main__":
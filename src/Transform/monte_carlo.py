@@ -1,5 +1,179 @@
 import pandas as pd
 import numpy as np
+import numba
+from numba import njit, prange
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+TRADING_DAYS_PER_YEAR = 252
+SIMULATION_CHUNK_SIZE = 64  # simulations per independently seeded chunk
+DRAW_CACHE_BYTES_PER_THREAD = 1 << 20  # budget for the float32 draws each kernel thread works through at once
+MIN_CORRELATION_DAYS = 20  # shared return days needed before two tickers' correlation is used
+
+# One record per simulation, ticker and year (ticker width matches the varchar(10) column in the db)
+SIMULATION_RESULT_DTYPE = np.dtype([
+    ('simulation_num', 'i4'),
+    ('ticker', 'U10'),
+    ('year', 'i2'),
+    ('starting_value', 'f8'),
+    ('ending_value', 'f8'),
+    ('annual_return', 'f8'),
+    ('cumulative_return', 'f8'),
+    ('volatility', 'f8'),
+    ('probability', 'f8')
+])
+
+
+# Compiled kernel: turns standard normal draws into correlated daily log returns and reduces them per year
+# in a single pass (running sum and sum of squares), so the full return paths are never stored
+@njit(parallel=True, fastmath=True, cache=True)
+def _path_statistics(
+    Z: np.ndarray,
+    mean: np.ndarray,
+    L: np.ndarray,
+    years: int,
+    log_growth: np.ndarray,
+    volatility: np.ndarray
+) -> None:
+    """
+    Args:
+        Z: Standard normal draws shaped (simulations, years * 252, tickers), typically float32
+        mean: Mean daily log return per ticker
+        L: Lower triangular factor of the daily return covariance (L @ L.T == cov)
+        years: Number of simulated years
+        log_growth: Output for the yearly log growth, shaped (simulations, years, tickers)
+        volatility: Output for the annualized yearly volatility, same shape as log_growth
+    """
+    n_sims, _, d = Z.shape
+    for sim in prange(n_sims):
+        sum_r = np.empty(d)
+        sum_sq = np.empty(d)
+        for year in range(years):
+            sum_r[:] = 0.0
+            sum_sq[:] = 0.0
+            for day in range(year * TRADING_DAYS_PER_YEAR, (year + 1) * TRADING_DAYS_PER_YEAR):
+                for j in range(d):
+                    r = mean[j]
+                    for k in range(j + 1):
+                        r += L[j, k] * Z[sim, day, k]
+                    sum_r[j] += r
+                    sum_sq[j] += r * r
+            for j in range(d):
+                mean_r = sum_r[j] / TRADING_DAYS_PER_YEAR
+                variance = max(sum_sq[j] / TRADING_DAYS_PER_YEAR - mean_r * mean_r, 0.0)
+                log_growth[sim, year, j] = sum_r[j]
+                volatility[sim, year, j] = np.sqrt(variance * TRADING_DAYS_PER_YEAR)
+
+
+# Cached on the raw bytes of the date-aligned price matrix, so repeated runs over the same history
+# (parameter sweeps, sensitivity analyses) skip the returns, correlation and factorization work entirely
+@functools.lru_cache(maxsize=32)
+def _get_mean_and_chol(price_bytes: bytes, shape: tuple[int, int]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Mean daily log return per ticker and a lower triangular factor L of their
+    covariance (L @ L.T == cov). Each ticker's mean and standard deviation come
+    from its own full price history; only the correlations use the days two
+    tickers share, and pairs sharing fewer than MIN_CORRELATION_DAYS return
+    days are treated as uncorrelated. Every ticker needs at least two prices.
+    The returned arrays are shared between calls, so they are read-only.
+    """
+    log_prices = np.log(np.frombuffer(price_bytes, dtype=np.float64).reshape(shape))
+
+    # Daily log return of each ticker between its consecutive prices, placed on the later date (NaN elsewhere)
+    daily_returns = np.full(shape, np.nan)
+    for j in range(shape[1]):
+        rows = np.flatnonzero(~np.isnan(log_prices[:, j]))
+        daily_returns[rows[1:], j] = np.diff(log_prices[rows, j])
+
+    mean_returns = np.nanmean(daily_returns, axis=0)
+    std_returns = np.nanstd(daily_returns, axis=0)
+
+    # Pairwise correlations over shared days; too little overlap or a price that never moves gives NaN -> 0
+    corr = pd.DataFrame(daily_returns).corr(min_periods=MIN_CORRELATION_DAYS).to_numpy()
+    corr = np.nan_to_num(corr, nan=0.0)
+    np.fill_diagonal(corr, 1.0)
+
+    try:
+        L_corr = np.linalg.cholesky(corr)
+    except np.linalg.LinAlgError:
+        # Pairwise estimates need not be jointly consistent: clip the negative eigenvalues, rescale back to a
+        # unit diagonal, and triangularize the resulting factor with QR (R.T @ R == corr) since the kernel
+        # only reads the lower triangle
+        eigenvalues, eigenvectors = np.linalg.eigh(corr)
+        factor = np.sqrt(np.clip(eigenvalues, 0.0, None))[:, None] * eigenvectors.T
+        factor /= np.linalg.norm(factor, axis=0)
+        L_corr = np.linalg.qr(factor, mode='r').T
+
+    # Scale the correlation factor's rows by each ticker's own standard deviation to get the covariance factor
+    L = np.ascontiguousarray(std_returns[:, None] * L_corr)
+    mean_returns.setflags(write=False)
+    L.setflags(write=False)
+    return mean_returns, L
+
+
+# Simulates one shard of independent paths; kept at module level so worker processes can pickle it
+def _run_mc_shard(
+    chunk_seeds: list[np.random.SeedSequence],
+    first_sim: int,
+    n_sims: int,
+    mean: np.ndarray,
+    L: np.ndarray,
+    years: int,
+    tickers: list[str],
+    starting_value: float,
+    n_threads: int
+) -> np.ndarray:
+    """
+    Simulate `n_sims` paths numbered from `first_sim` using daily log returns
+    drawn as mean + Z @ L.T, aggregated per simulation, ticker and year.
+    Chunk i of SIMULATION_CHUNK_SIZE simulations draws from `chunk_seeds[i]`.
+    Returns one SIMULATION_RESULT_DTYPE record per simulation, ticker and year.
+    """
+    d = len(tickers)
+    total_days = years * TRADING_DAYS_PER_YEAR
+    numba.set_num_threads(n_threads)
+
+    # Draw as many simulations at a time as fit in the threads' cache budget, so peak memory is
+    # O(batch * days * tickers) whatever n_sims is. Splitting a generator's draws into batches does not
+    # change the stream, so the batch size has no effect on the results.
+    batch_size = max(1, n_threads * DRAW_CACHE_BYTES_PER_THREAD // (total_days * d * np.dtype(np.float32).itemsize))
+
+    # Per simulation/year/ticker log growth and annualized volatility, filled in place batch by batch
+    yearly_log_growth = np.empty((n_sims, years, d))
+    yearly_volatility = np.empty((n_sims, years, d))
+    for chunk_seed, chunk_start in zip(chunk_seeds, range(0, n_sims, SIMULATION_CHUNK_SIZE)):
+        chunk_end = min(chunk_start + SIMULATION_CHUNK_SIZE, n_sims)
+        rng = np.random.default_rng(chunk_seed)
+        for batch_start in range(chunk_start, chunk_end, batch_size):
+            batch_end = min(batch_start + batch_size, chunk_end)
+            Z = rng.standard_normal((batch_end - batch_start, total_days, d), dtype=np.float32)
+            _path_statistics(
+                Z, mean, L, years,
+                yearly_log_growth[batch_start:batch_end], yearly_volatility[batch_start:batch_end]
+            )
+
+    ending_vals = starting_value * np.exp(np.cumsum(yearly_log_growth, axis=1))
+    starting_vals = np.concatenate(
+        [np.full((n_sims, 1, d), starting_value), ending_vals[:, :-1]], axis=1
+    )
+
+    # Rows are ordered by simulation, ticker, then year: move tickers ahead of years and flatten
+    def flatten(values: np.ndarray) -> np.ndarray:
+        return values.transpose(0, 2, 1).ravel()
+
+    out = np.empty(n_sims * d * years, dtype=SIMULATION_RESULT_DTYPE)
+    out['simulation_num'] = np.arange(first_sim, first_sim + n_sims).repeat(d * years)
+    out['ticker'] = np.tile(np.repeat(tickers, years), n_sims)
+    out['year'] = np.tile(np.arange(1, years + 1), n_sims * d)
+    out['starting_value'] = flatten(starting_vals)
+    out['ending_value'] = flatten(ending_vals)
+    out['annual_return'] = flatten(np.expm1(yearly_log_growth))
+    out['cumulative_return'] = flatten(ending_vals / starting_value - 1)
+    out['volatility'] = flatten(yearly_volatility)
+    out['probability'] = flatten(ending_vals > starting_value)
+    return out
+
 
 # Monte Carlo simulation with annual aggregation using previously cleaned DataFrame
 # Can pass any list of tickers, portfolio value, and years
@@ -9,83 +183,69 @@ def run_monte_carlo(
     portfolio_value: float = 250000,
     years: int = 10,
     num_simulations: int = 10000,
-    seed: int = None
+    seed: int | None = None,
+    num_workers: int = 1
 ) -> pd.DataFrame:
     """
     Monte Carlo simulation using pre-cleaned stock data from Transform module.
+    Daily log returns are drawn jointly for all tickers: each ticker keeps the
+    mean and volatility of its own history, and tickers are correlated as
+    they were over the days they both traded.
+    Simulations are independent, so with num_workers > 1 they are split into
+    shards that run in separate processes. Every chunk of simulations draws
+    from its own PCG64 stream spawned from SeedSequence(seed), so a given seed
+    gives the same results whatever the number of workers.
+    Within a shard the compiled kernel spreads simulations across threads.
     Columns: id, ticker, simulation_num, year, starting_value, ending_value,
              annual_return, cumulative_return, volatility, probability
     """
 
-    if seed is not None:
-        np.random.seed(seed)
-
     # Ensure dataframe has required columns
     required_cols = ['ticker', 'date', 'adj_close']
     for col in required_cols:
         if col not in df.columns:
             raise ValueError(f"DataFrame must contain '{col}' column")
 
-    results = []
-    trading_days_per_year = 252
     n_tickers = len(tickers)
 
-    for sim in range(num_simulations):
-        for ticker in tickers:
-            # Select ticker's historical prices
-            ticker_data = df[df['ticker'] == ticker].sort_values('date')
-            prices = ticker_data['adj_close'].values
-            if len(prices) < 2:
-                continue  # skip tickers with insufficient data
-
-            # Compute daily log returns from cleaned prices
-            daily_returns = np.log(prices[1:] / prices[:-1])
-
-            # Mean and covariance for univariate simulation
-            mean_return = daily_returns.mean()
-            std_return = daily_returns.std()
-
-            # Simulate daily returns for 'years'
-            total_days = years * trading_days_per_year
-            simulated_returns = np.random.normal(
-                loc=mean_return,
-                scale=std_return,
-                size=total_days
-            )
-            growth_factors = np.exp(simulated_returns)
-
-            starting_val = portfolio_value / n_tickers
-            initial_val = starting_val
-
-            # Track values per year
-            for year in range(1, years + 1):
-                start_idx = (year - 1) * trading_days_per_year
-                end_idx = year * trading_days_per_year
-                yearly_growth = growth_factors[start_idx:end_idx].prod()
-                ending_val = starting_val * yearly_growth
-
-                annual_return = yearly_growth - 1
-                cumulative_return = (ending_val / initial_val) - 1
-                volatility = np.std(
-                    simulated_returns[start_idx:end_idx]
-                ) * np.sqrt(trading_days_per_year)
-                probability = 1.0 if ending_val > initial_val else 0.0
-
-                results.append({
-                    "simulation_num": sim,
-                    "ticker": ticker,
-                    "year": year,
-                    "starting_value": starting_val,
-                    "ending_value": ending_val,
-                    "annual_return": annual_return,
-                    "cumulative_return": cumulative_return,
-                    "volatility": volatility,
-                    "probability": probability
-                })
-
-                starting_val = ending_val
-
-    return pd.DataFrame(results)
+    # Line the tickers' prices up by date so they can be simulated as one correlated series
+    price_data = df[df['ticker'].isin(tickers)].pivot(index='date', columns='ticker', values='adj_close')
+    sim_tickers = [t for t in tickers if t in price_data.columns and price_data[t].count() >= 2]  # skip tickers with insufficient data
+    if not sim_tickers or num_simulations < 1 or years < 1:
+        return pd.DataFrame()
+    price_data = price_data[sim_tickers].to_numpy(dtype=np.float64)
+
+    # Mean vector and triangular factor of the covariance, computed once per distinct price history
+    mean_returns, L = _get_mean_and_chol(price_data.tobytes(), price_data.shape)
+
+    # Simulated daily returns only feed a sum and a standard deviation, so single precision is plenty
+    # and halves the memory traffic of the draws; the per-year statistics are still accumulated in float64
+    mean_f32 = mean_returns.astype(np.float32)
+    L_f32 = L.astype(np.float32)
+    starting_value = portfolio_value / n_tickers
+
+    # Give every chunk of simulations an independent child seed, then split the chunks as evenly as possible
+    n_chunks = -(-num_simulations // SIMULATION_CHUNK_SIZE)
+    chunk_seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    n_shards = max(1, min(num_workers, n_chunks))
+    n_threads = max(1, numba.config.NUMBA_NUM_THREADS // n_shards)  # share the cores between shard processes
+    shard_args = []
+    for shard_chunks in np.array_split(np.arange(n_chunks), n_shards):
+        first_chunk, last_chunk = int(shard_chunks[0]), int(shard_chunks[-1]) + 1
+        first_sim = first_chunk * SIMULATION_CHUNK_SIZE
+        n_sims = min(last_chunk * SIMULATION_CHUNK_SIZE, num_simulations) - first_sim
+        shard_args.append((
+            chunk_seeds[first_chunk:last_chunk], first_sim, n_sims,
+            mean_f32, L_f32, years, sim_tickers, starting_value, n_threads
+        ))
+
+    if n_shards == 1:
+        return pd.DataFrame(_run_mc_shard(*shard_args[0]))
+
+    # Spawn fresh interpreters: forking after numba's thread pool has started can deadlock the children
+    with ProcessPoolExecutor(max_workers=n_shards, mp_context=multiprocessing.get_context('spawn')) as executor:
+        shards = list(executor.map(_run_mc_shard, *zip(*shard_args)))
+    return pd.DataFrame(np.concatenate(shards))
 
 
 # Needed to create a different transform function due to different columns from live data
@@ -4,6 +4,7 @@ from src.Transform.monte_carlo import run_monte_carlo, transform_monte_carlo_dat
 from src.db.insertion import insert_stock_data, insert_sim_data
 from src.db.connection import psql_connect_and_setup
 import pandas as pd
+import os
 import psycopg
 from typing import Dict, Union
 
@@ -65,7 +66,7 @@ def compile_ETL_data(api_1: str='api_1', db_credentials: dict[str]=None, source:
         transformed_data = pd.DataFrame(columns=['ticker', 'date', 'open', 'high', 'low', 'close', 'adj_close', 'volume'])
 
     #now that we have the cleaned data we pass it to the monte carlo to run and then store that table as well!
-    monte_carlo_results = run_monte_carlo(df=transformed_data, tickers=tickers, portfolio_value=250000, years=10, num_simulations=10000, seed=None)
+    monte_carlo_results = run_monte_carlo(df=transformed_data, tickers=tickers, portfolio_value=250000, years=10, num_simulations=10000, seed=None, num_workers=os.cpu_count() or 1)  # cpu_count() is None when it cannot be determined
     transformed_monte_carlo_data = transform_monte_carlo_data(monte_carlo_results)
     #assume that at this point the data was extracted and transformed successfully!
     #itertuples needs to have the exact order for insertion otherwise it will break the code!!!
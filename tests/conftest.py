@@ -4,7 +4,8 @@ Pytest configuration and shared fixtures
 import pytest
 import pandas as pd
 import numpy as np
-from config import api_keys
+import psycopg
+from config import api_keys, db_credentials
 
 
 @pytest.fixture
@@ -16,7 +17,62 @@ def finnhub_api_key():
     return key
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def db_config():
+    """Fixture for database connection keyword arguments"""
+    return {
+        'host': db_credentials.get('host', '127.0.0.1'),
+        'port': db_credentials.get('port', '5432'),
+        'user': db_credentials.get('user', 'postgres'),
+        'password': db_credentials.get('password', ''),
+        'dbname': db_credentials.get('database', 'monte_sim_stock_data'),
+        'connect_timeout': db_credentials['timeout'],
+    }
+
+
+@pytest.fixture(scope="session")
+def db_conn(db_config):
+    """Fixture providing one database connection shared by the whole test session"""
+    try:
+        conn = psycopg.connect(**db_config, autocommit=True)
+    except psycopg.DatabaseError as e:
+        pytest.skip(f"Cannot connect to database: {e}")
+    yield conn
+    conn.close()
+
+
+def _cached_yf_download(cache_dir, name, **kwargs):
+    """Download from yfinance once and reload the parquet copy on later runs"""
+    path = cache_dir / f"{name}.parquet"
+    if path.exists():
+        return pd.read_parquet(path)
+    
+    import yfinance as yf
+    data = yf.download(**kwargs)
+    if not data.empty:
+        data.to_parquet(path)
+    return data
+
+
+@pytest.fixture(scope="session")
+def yf_cache_dir(request):
+    """Fixture for the directory holding cached yfinance downloads (inside .pytest_cache)"""
+    return request.config.cache.mkdir("yfinance")
+
+
+@pytest.fixture(scope="session")
+def yf_multi_download(yf_cache_dir):
+    """Fixture providing a multi-ticker yfinance download"""
+    return _cached_yf_download(yf_cache_dir, "yf_multi", tickers=["AAPL", "NVDA"], period="5d", auto_adjust=False)
+
+
+@pytest.fixture(scope="session")
+def yf_auto_adjust_download(yf_cache_dir):
+    """Fixture providing a yfinance download with auto_adjust=True"""
+    return _cached_yf_download(yf_cache_dir, "yf_auto_adjust", tickers=["AAPL"], period="5d", auto_adjust=True)
+
+
+@pytest.fixture(scope="module")
 def sample_stock_data():
     """Fixture providing sample stock data for testing"""
     return pd.DataFrame({
@@ -31,7 +87,7 @@ def sample_stock_data():
     })
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def dirty_stock_data():
     """Fixture providing stock data with validation issues"""
     return pd.DataFrame({
@@ -46,7 +102,7 @@ def dirty_stock_data():
     })
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_finnhub_data():
     """Fixture providing sample Finnhub API response data"""
     return pd.DataFrame({
@@ -60,7 +116,7 @@ def sample_finnhub_data():
     })
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_yfinance_data():
     """Fixture providing sample yfinance MultiIndex DataFrame structure"""
     dates = pd.date_range('2024-01-01', periods=5, freq='D')
@@ -76,3 +132,37 @@ def sample_yfinance_data():
     df.columns = pd.MultiIndex.from_tuples(df.columns)
     return df
 
+
+
+@pytest.fixture(scope="module")
+def make_yfinance_price_first_data():
+    """Fixture providing a builder for yfinance's default layout: ('Price', 'Ticker') columns with tickers in level 1"""
+    def build(tickers, adj_close=True):
+        dates = pd.date_range('2024-01-01', periods=5, freq='D')
+        base = np.arange(5, dtype=float)
+        data = {}
+        for i, ticker in enumerate(tickers):
+            start = 150.0 + 50.0 * i
+            data[('Open', ticker)] = start + base
+            data[('High', ticker)] = start + 2 + base
+            data[('Low', ticker)] = start - 1 + base
+            data[('Close', ticker)] = start + 1 + base
+            if adj_close:
+                data[('Adj Close', ticker)] = start + 0.5 + base  # differs from Close so the fallback is visible
+            data[('Volume', ticker)] = 1000000 + 100000 * np.arange(5)
+        df = pd.DataFrame(data, index=pd.DatetimeIndex(dates, name='Date'))
+        df.columns = pd.MultiIndex.from_tuples(df.columns, names=['Price', 'Ticker'])
+        return df
+    return build
+
+
+@pytest.fixture
+def sample_price_history():
+    """Fixture providing a few months of cleaned prices for two tickers"""
+    rng = np.random.default_rng(42)
+    dates = pd.date_range('2024-01-01', periods=60, freq='B')
+    frames = []
+    for ticker, start in [('AAPL', 150.0), ('NVDA', 200.0)]:
+        prices = start * np.exp(np.cumsum(rng.normal(0.0005, 0.02, size=len(dates))))
+        frames.append(pd.DataFrame({'ticker': ticker, 'date': dates, 'adj_close': prices}))
+    return pd.concat(frames, ignore_index=True)
@@ -6,6 +6,7 @@ import pandas as pd
 import requests
 import yfinance as yf
 from config import api_keys
+from src.Extract.yfinance_fetch_data import fetch_yfinance_data, MAX_TICKERS_PER_REQUEST
 
 
 class TestYahooFinanceAPI:
@@ -93,3 +94,43 @@ class TestFinnhubAPI:
                 assert 'c' in data, "Should have close prices"
                 assert 't' in data, "Should have timestamps"
 
+
+class TestFetchYFinanceData:
+    """Test batching of yfinance downloads (offline, yf.download is replaced)"""
+    
+    @pytest.fixture
+    def download_calls(self, monkeypatch):
+        """Fixture recording every yf.download call and answering with a group_by='ticker' frame"""
+        calls = []
+        
+        def fake_download(tickers, **kwargs):
+            calls.append((list(tickers), kwargs))
+            columns = pd.MultiIndex.from_product([tickers, ['Open', 'Close']], names=['Ticker', 'Price'])
+            return pd.DataFrame(1.0, index=pd.date_range('2024-01-01', periods=3, name='Date'), columns=columns)
+        
+        monkeypatch.setattr(yf, 'download', fake_download)
+        return calls
+    
+    @pytest.mark.parametrize("n_tickers", [1, 20, 21, 45])
+    def test_fetch_yfinance_data_batches(self, download_calls, n_tickers):
+        """Test that tickers are requested in batches of at most MAX_TICKERS_PER_REQUEST and joined column-wise"""
+        tickers = [f"T{i}" for i in range(n_tickers)]
+        data = fetch_yfinance_data(tickers, '5d')
+        
+        assert len(download_calls) == -(-n_tickers // MAX_TICKERS_PER_REQUEST)
+        assert [t for batch, _ in download_calls for t in batch] == tickers, "Every ticker requested once, in order"
+        for batch, kwargs in download_calls:
+            assert len(batch) <= MAX_TICKERS_PER_REQUEST
+            assert kwargs['group_by'] == 'ticker'
+            assert kwargs['threads'] is True
+            assert kwargs['auto_adjust'] is False
+            assert kwargs['period'] == '5d'
+        assert list(data.columns.get_level_values(0).unique()) == tickers
+        assert data.shape == (3, 2 * n_tickers), "Batches should be joined side by side on the same dates"
+    
+    def test_fetch_yfinance_data_no_tickers(self, download_calls):
+        """Test that an empty ticker list makes no request"""
+        data = fetch_yfinance_data([], '5d')
+        
+        assert data.empty
+        assert download_calls == []
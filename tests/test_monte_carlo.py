@@ -0,0 +1,139 @@
+"""
+Tests for Monte Carlo simulation
+"""
+import pytest
+import pandas as pd
+import numpy as np
+from src.Transform.monte_carlo import run_monte_carlo, transform_monte_carlo_data
+
+
+class TestRunMonteCarlo:
+    """Test Monte Carlo simulation"""
+    
+    def test_run_monte_carlo_structure(self, sample_price_history):
+        """Test that one row is produced per simulation, ticker and year"""
+        result = run_monte_carlo(sample_price_history, ['AAPL', 'NVDA'], years=3, num_simulations=20, seed=1)
+        
+        assert len(result) == 20 * 2 * 3, "Should have one row per simulation/ticker/year"
+        assert set(result['ticker']) == {'AAPL', 'NVDA'}
+        assert list(result.columns) == [
+            'simulation_num', 'ticker', 'year', 'starting_value', 'ending_value',
+            'annual_return', 'cumulative_return', 'volatility', 'probability'
+        ]
+    
+    def test_run_monte_carlo_compounds_yearly(self, sample_price_history):
+        """Test that each year starts from the previous year's ending value"""
+        result = run_monte_carlo(sample_price_history, ['AAPL', 'NVDA'], portfolio_value=1000, years=3, num_simulations=5, seed=1)
+        
+        first_year = result[result['year'] == 1]
+        assert np.allclose(first_year['starting_value'], 500.0), "Portfolio should be split evenly"
+        for _, group in result.groupby(['simulation_num', 'ticker']):
+            group = group.sort_values('year')
+            assert np.allclose(group['starting_value'].values[1:], group['ending_value'].values[:-1])
+            assert np.allclose(group['annual_return'], group['ending_value'] / group['starting_value'] - 1)
+    
+    def test_run_monte_carlo_seed_is_reproducible(self, sample_price_history):
+        """Test that the same seed gives the same simulation"""
+        first = run_monte_carlo(sample_price_history, ['AAPL', 'NVDA'], years=2, num_simulations=10, seed=7)
+        second = run_monte_carlo(sample_price_history, ['AAPL', 'NVDA'], years=2, num_simulations=10, seed=7)
+        
+        pd.testing.assert_frame_equal(first, second)
+    
+    def test_run_monte_carlo_skips_missing_tickers(self, sample_price_history):
+        """Test that tickers without price history are skipped"""
+        result = run_monte_carlo(sample_price_history, ['AAPL', 'MISSING'], years=1, num_simulations=5, seed=1)
+        
+        assert set(result['ticker']) == {'AAPL'}
+    
+    def test_run_monte_carlo_flat_price(self, sample_price_history):
+        """Test that a ticker whose price never moves is simulated with zero volatility"""
+        flat = sample_price_history[sample_price_history['ticker'] == 'AAPL'].assign(ticker='FLAT', adj_close=100.0)
+        data = pd.concat([sample_price_history, flat], ignore_index=True)
+        result = run_monte_carlo(data, ['AAPL', 'NVDA', 'FLAT'], years=2, num_simulations=5, seed=1)
+        
+        assert len(result) == 5 * 3 * 2
+        flat_rows = result[result['ticker'] == 'FLAT']
+        assert np.allclose(flat_rows['volatility'], 0.0)
+        assert np.allclose(flat_rows['ending_value'], flat_rows['starting_value'])
+    
+    def test_run_monte_carlo_fewer_days_than_tickers(self):
+        """Test that a short history (fewer return days than tickers) still simulates every ticker"""
+        rng = np.random.default_rng(0)
+        tickers = ['T1', 'T2', 'T3', 'T4', 'T5', 'T6']
+        dates = pd.date_range('2024-01-01', periods=5, freq='B')
+        data = pd.DataFrame({
+            'ticker': np.repeat(tickers, len(dates)),
+            'date': np.tile(dates, len(tickers)),
+            'adj_close': 100 * np.exp(rng.normal(0, 0.02, size=len(tickers) * len(dates)))
+        })
+        result = run_monte_carlo(data, tickers, years=1, num_simulations=3, seed=1)
+        
+        assert len(result) == 3 * 6 * 1
+        assert np.isfinite(result[['ending_value', 'volatility']].to_numpy()).all()
+    
+    def test_run_monte_carlo_short_history_ticker(self, sample_price_history):
+        """Test that a ticker listed late neither drops the others nor shrinks their history"""
+        aapl = sample_price_history[sample_price_history['ticker'] == 'AAPL']
+        new = aapl.tail(2).assign(ticker='NEW')
+        data = pd.concat([sample_price_history, new], ignore_index=True)
+        result = run_monte_carlo(data, ['AAPL', 'NVDA', 'NEW'], years=1, num_simulations=100, seed=1)
+        alone = run_monte_carlo(sample_price_history, ['AAPL', 'NVDA'], years=1, num_simulations=100, seed=1)
+        
+        assert set(result['ticker']) == {'AAPL', 'NVDA', 'NEW'}
+        for ticker in ['AAPL', 'NVDA']:
+            assert np.isclose(
+                result.loc[result['ticker'] == ticker, 'volatility'].mean(),
+                alone.loc[alone['ticker'] == ticker, 'volatility'].mean(),
+                rtol=0.05
+            ), "Each ticker's volatility should come from its own full history"
+    
+    def test_run_monte_carlo_disjoint_histories(self, sample_price_history):
+        """Test that tickers whose histories never overlap are all simulated"""
+        aapl = sample_price_history[sample_price_history['ticker'] == 'AAPL']
+        nvda = sample_price_history[sample_price_history['ticker'] == 'NVDA']
+        data = pd.concat([aapl.head(30), nvda.tail(30)], ignore_index=True)
+        result = run_monte_carlo(data, ['AAPL', 'NVDA'], years=1, num_simulations=5, seed=1)
+        
+        assert len(result) == 5 * 2
+        assert result['volatility'].gt(0).all()
+    
+    def test_run_monte_carlo_zero_years(self, sample_price_history):
+        """Test that a zero-year horizon gives no rows"""
+        result = run_monte_carlo(sample_price_history, ['AAPL', 'NVDA'], years=0, num_simulations=5, seed=1)
+        
+        assert result.empty
+    
+    def test_run_monte_carlo_missing_column(self, sample_price_history):
+        """Test that a DataFrame without adj_close is rejected"""
+        with pytest.raises(ValueError, match="adj_close"):
+            run_monte_carlo(sample_price_history.drop(columns=['adj_close']), ['AAPL'])
+    
+    def test_transform_monte_carlo_data(self, sample_price_history):
+        """Test that simulation results are sorted and typed for insertion"""
+        result = transform_monte_carlo_data(
+            run_monte_carlo(sample_price_history, ['NVDA', 'AAPL'], years=2, num_simulations=3, seed=1)
+        )
+        
+        assert result['ticker'].iloc[0] == 'AAPL'
+        assert result['probability'].isin([0.0, 1.0]).all()
+    
+    def test_run_monte_carlo_multiple_workers(self, sample_price_history):
+        """Test that sharding across processes keeps every simulation exactly once"""
+        result = run_monte_carlo(sample_price_history, ['AAPL', 'NVDA'], years=2, num_simulations=150, seed=3, num_workers=3)
+        
+        assert len(result) == 150 * 2 * 2
+        assert sorted(result['simulation_num'].unique()) == list(range(150))
+    
+    def test_run_monte_carlo_seed_independent_of_workers(self, sample_price_history):
+        """Test that a seeded run gives the same paths however it is sharded"""
+        serial = run_monte_carlo(sample_price_history, ['AAPL', 'NVDA'], years=1, num_simulations=150, seed=9)
+        parallel = run_monte_carlo(sample_price_history, ['AAPL', 'NVDA'], years=1, num_simulations=150, seed=9, num_workers=2)
+        
+        pd.testing.assert_frame_equal(serial, parallel)
+    
+    def test_run_monte_carlo_spans_several_chunks(self, sample_price_history):
+        """Test that simulations drawn across several chunks are all kept"""
+        result = run_monte_carlo(sample_price_history, ['AAPL', 'NVDA'], years=1, num_simulations=150, seed=5)
+        
+        assert len(result) == 150 * 2
+        assert result['volatility'].gt(0).all()
@@ -10,6 +10,36 @@ from src.Transform.main import (
     transform_extracted_data
 )
 
+# Single row whose high is below its low
+_INVALID_RANGE_DF = pd.DataFrame({
+    'ticker': ['AAPL'],
+    'date': ['2024-01-01'],
+    'open': [150.0],
+    'high': [140.0],  # High < Low (invalid)
+    'low': [145.0],
+    'close': [148.0],
+    'adj_close': [148.0],
+    'volume': [1000000]
+})
+
+# Two rows, the second missing its open price
+_NULL_DF = pd.DataFrame({
+    'ticker': ['AAPL', 'NVDA'],
+    'date': ['2024-01-01', '2024-01-02'],
+    'open': [150.0, None],  # Missing value
+    'high': [152.0, 201.0],
+    'low': [149.0, 199.0],
+    'close': [151.0, 200.0],
+    'adj_close': [151.0, 200.0],
+    'volume': [1000000, 2000000]
+})
+
+
+@pytest.fixture(scope="module")
+def dup_row(sample_stock_data):
+    """Fixture providing the first sample row, for injecting a duplicate"""
+    return sample_stock_data.iloc[0:1]
+
 
 class TestTransformYFinance:
     """Test yfinance data transformation"""
@@ -23,28 +53,41 @@ class TestTransformYFinance:
         assert 'date' in result.columns, "Should have date column"
         assert 'adj_close' in result.columns, "Should have adj_close column"
         assert len(result.columns) == 8, "Should have 8 columns"
-        assert all(result['ticker'] == 'AAPL'), "All rows should be AAPL"
+        assert (result['ticker'] == 'AAPL').to_numpy().all(), "All rows should be AAPL"
     
-    def test_transform_yfinance_multiple_tickers(self):
-        """Test transforming multiple tickers from yfinance"""
-        import yfinance as yf
+    @pytest.mark.parametrize("tickers", [["AAPL"], ["AAPL", "NVDA"]])
+    @pytest.mark.parametrize("adj_close", [True, False])
+    def test_transform_yfinance_price_first_layout(self, make_yfinance_price_first_data, tickers, adj_close):
+        """Test transforming yfinance's default layout, with tickers in column level 1"""
+        data = make_yfinance_price_first_data(tickers, adj_close=adj_close)
+        result = transform_yfinance_data(data)
         
-        # Download multiple tickers
-        tickers = ["AAPL", "NVDA"]
-        data = yf.download(tickers, period="5d", auto_adjust=False)
+        assert list(result.columns) == ['ticker', 'date', 'open', 'high', 'low', 'close', 'adj_close', 'volume']
+        assert len(result) == 5 * len(tickers), "Should have one row per date and ticker"
+        assert list(result['ticker'].cat.categories) == sorted(tickers)
+        for ticker in tickers:
+            rows = result[result['ticker'] == ticker]
+            assert (rows['open'].to_numpy() == data[('Open', ticker)].to_numpy()).all()
+            # Adj Close is kept when present, otherwise close stands in for it
+            expected = data[('Adj Close', ticker)] if adj_close else data[('Close', ticker)]
+            assert (rows['adj_close'].to_numpy() == expected.to_numpy()).all()
+    
+    @pytest.mark.network
+    def test_transform_yfinance_multiple_tickers(self, yf_multi_download):
+        """Test transforming multiple tickers from yfinance"""
+        data = yf_multi_download
         
         if not data.empty:
             result = transform_yfinance_data(data)
             
             assert not result.empty, "Result should not be empty"
             assert 'ticker' in result.columns
-            assert len(result['ticker'].unique()) >= 1, "Should have at least one ticker"
+            assert result['ticker'].nunique() >= 1, "Should have at least one ticker"
     
-    def test_transform_yfinance_auto_adjust(self):
+    @pytest.mark.network
+    def test_transform_yfinance_auto_adjust(self, yf_auto_adjust_download):
         """Test transforming yfinance data with auto_adjust=True"""
-        import yfinance as yf
-        
-        data = yf.download(["AAPL"], period="5d", auto_adjust=True)
+        data = yf_auto_adjust_download
         
         if not data.empty:
             result = transform_yfinance_data(data)
@@ -52,15 +95,7 @@ class TestTransformYFinance:
             assert not result.empty
             assert 'adj_close' in result.columns
             # When auto_adjust=True, adj_close should equal close
-            assert all(result['adj_close'] == result['close'])
-    
-    def test_transform_yfinance_empty_data(self):
-        """Test transforming empty DataFrame"""
-        empty_df = pd.DataFrame()
-        result = transform_yfinance_data(empty_df)
-        
-        assert result.empty
-        assert list(result.columns) == ['ticker', 'date', 'open', 'high', 'low', 'close', 'adj_close', 'volume']
+            assert (result['adj_close'].to_numpy() == result['close'].to_numpy()).all()
 
 
 class TestTransformFinnhub:
@@ -74,17 +109,9 @@ class TestTransformFinnhub:
         assert 'ticker' in result.columns
         assert 'date' in result.columns
         assert 'adj_close' in result.columns
-        assert all(result['ticker'] == 'AAPL')
+        assert (result['ticker'] == 'AAPL').to_numpy().all()
         # Finnhub doesn't provide adj_close, so it should use close
-        assert all(result['adj_close'] == result['close'])
-    
-    def test_transform_finnhub_empty_data(self):
-        """Test transforming empty Finnhub DataFrame"""
-        empty_df = pd.DataFrame()
-        result = transform_finnhub_data(empty_df)
-        
-        assert result.empty
-        assert list(result.columns) == ['ticker', 'date', 'open', 'high', 'low', 'close', 'adj_close', 'volume']
+        assert (result['adj_close'].to_numpy() == result['close'].to_numpy()).all()
 
 
 class TestCleanStockData:
@@ -93,68 +120,71 @@ class TestCleanStockData:
     def test_clean_stock_data_removes_negative_prices(self, dirty_stock_data):
         """Test that negative prices are removed"""
         cleaned = clean_stock_data(dirty_stock_data)
+        opens = cleaned['open'].to_numpy()
         
-        assert len(cleaned) < len(dirty_stock_data), "Should remove invalid rows"
-        assert all(cleaned['open'] > 0), "All prices should be positive"
+        assert opens.size < len(dirty_stock_data), "Should remove invalid rows"
+        assert (opens > 0).all(), "All prices should be positive"
     
-    def test_clean_stock_data_removes_duplicates(self, sample_stock_data):
+    def test_clean_stock_data_removes_duplicates(self, sample_stock_data, dup_row):
         """Test that duplicate rows are removed"""
         # Add duplicate
-        duplicated = pd.concat([sample_stock_data, sample_stock_data.iloc[[0]]], ignore_index=True)
+        duplicated = pd.concat([sample_stock_data, dup_row], ignore_index=True, sort=False)
         cleaned = clean_stock_data(duplicated)
         
         assert len(cleaned) == len(sample_stock_data), "Duplicates should be removed"
     
     def test_clean_stock_data_validates_price_ranges(self):
         """Test that invalid price ranges are removed"""
-        invalid_data = pd.DataFrame({
-            'ticker': ['AAPL'],
-            'date': ['2024-01-01'],
-            'open': [150.0],
-            'high': [140.0],  # High < Low (invalid)
-            'low': [145.0],
-            'close': [148.0],
-            'adj_close': [148.0],
-            'volume': [1000000]
-        })
-        
-        cleaned = clean_stock_data(invalid_data)
+        cleaned = clean_stock_data(_INVALID_RANGE_DF.copy())
         assert len(cleaned) == 0, "Invalid price ranges should be removed"
     
     def test_clean_stock_data_handles_missing_values(self):
         """Test that rows with missing critical data are removed"""
-        data_with_nulls = pd.DataFrame({
-            'ticker': ['AAPL', 'NVDA'],
-            'date': ['2024-01-01', '2024-01-02'],
-            'open': [150.0, None],  # Missing value
-            'high': [152.0, 201.0],
-            'low': [149.0, 199.0],
-            'close': [151.0, 200.0],
-            'adj_close': [151.0, 200.0],
-            'volume': [1000000, 2000000]
-        })
-        
-        cleaned = clean_stock_data(data_with_nulls)
+        cleaned = clean_stock_data(_NULL_DF.copy())
         assert len(cleaned) == 1, "Row with missing data should be removed"
         assert cleaned.iloc[0]['ticker'] == 'AAPL'
+    
+    def test_clean_stock_data_removes_missing_keys(self, sample_stock_data):
+        """Test that rows without a ticker or date are removed"""
+        data = sample_stock_data.copy()
+        data.loc[0, 'ticker'] = None
+        data.loc[1, 'date'] = None
+        cleaned = clean_stock_data(data)
+        
+        assert len(cleaned) == 2, "Rows missing ticker or date should be removed"
+        assert (cleaned['ticker'] == 'NVDA').to_numpy().all()
+    
+    def test_clean_stock_data_ticker_is_categorical(self, sample_stock_data):
+        """Test that tickers are stored as upper-case categories"""
+        cleaned = clean_stock_data(sample_stock_data.assign(ticker=sample_stock_data['ticker'].str.lower()))
+        
+        assert isinstance(cleaned['ticker'].dtype, pd.CategoricalDtype)
+        assert list(cleaned['ticker'].cat.categories) == ['AAPL', 'NVDA']
 
 
 class TestTransformExtractedData:
     """Test main transform function"""
     
-    def test_transform_extracted_data_yfinance(self, sample_yfinance_data):
-        """Test transform_extracted_data with yfinance source"""
-        result = transform_extracted_data(sample_yfinance_data, source='yfinance')
+    @pytest.mark.parametrize("source,fixture_name", [
+        ("yfinance", "sample_yfinance_data"),
+        ("finnhub", "sample_finnhub_data"),
+    ])
+    def test_transform_extracted_data_dispatch(self, request, source, fixture_name):
+        """Test transform_extracted_data routes each source to its transformer"""
+        result = transform_extracted_data(request.getfixturevalue(fixture_name), source=source)
         
         assert not result.empty
         assert 'ticker' in result.columns
+        assert isinstance(result['ticker'].dtype, pd.CategoricalDtype)
     
-    def test_transform_extracted_data_finnhub(self, sample_finnhub_data):
-        """Test transform_extracted_data with finnhub source"""
-        result = transform_extracted_data(sample_finnhub_data, source='finnhub')
+    @pytest.mark.parametrize("source", ["yfinance", "finnhub"])
+    def test_transform_empty_data(self, source):
+        """Test transforming empty DataFrame from each source"""
+        transform = {'yfinance': transform_yfinance_data, 'finnhub': transform_finnhub_data}[source]
+        result = transform(pd.DataFrame())
         
-        assert not result.empty
-        assert 'ticker' in result.columns
+        assert result.empty
+        assert list(result.columns) == ['ticker', 'date', 'open', 'high', 'low', 'close', 'adj_close', 'volume']
     
     def test_transform_extracted_data_invalid_source(self, sample_stock_data):
         """Test transform_extracted_data with invalid source"""